@@ -8,6 +8,7 @@ from dotenv import load_dotenv
 from src.llm_client import get_llm
 from src.evaluator import evaluate_answer
 from src.storage import Storage
+from src.prefetch import Prefetcher, metrics as prefetch_metrics
 
 load_dotenv()
 
@@ -26,11 +27,31 @@ def load_questions(role):
     except FileNotFoundError:
         return {"Junior": [], "Intermediate": [], "Senior": []}
 
-# Initialize storage
-storage = Storage(db_path="sessions.json")
+# Initialize storage once per server process, with retention and background compaction.
+# SESSIONS_DOWNSAMPLE_DAYS: keep only scores for older records (default 90, empty to disable)
+# SESSIONS_RETENTION_DAYS: delete records entirely after this many days (default: never)
+@st.cache_resource
+def get_storage():
+    retention = os.getenv("SESSIONS_RETENTION_DAYS")
+    downsample = os.getenv("SESSIONS_DOWNSAMPLE_DAYS", "90")
+    storage = Storage(
+        db_path="sessions.json",
+        retention_days=int(retention) if retention else None,
+        downsample_after_days=int(downsample) if downsample else None,
+    )
+    storage.start_background_compaction(interval_seconds=3600)
+    return storage
+
+storage = get_storage()
 
 st.title("AI Interview Coach")
 
+# Warms evaluation context in the background while the user types.
+# Per-session futures only; worker threads and metrics are process-wide.
+if "prefetcher" not in st.session_state:
+    st.session_state.prefetcher = Prefetcher()
+prefetcher = st.session_state.prefetcher
+
 with st.sidebar:
     st.header("Session")
     user_name = st.text_input("Your name (optional)")
@@ -40,6 +61,7 @@ with st.sidebar:
         questions = load_questions(role)
         if questions.get(level):
             st.session_state.current_question = random.choice(questions[level])
+            prefetcher.prefetch(st.session_state.current_question, role, level)
         else:
             st.session_state.current_question = "No questions found for this role/level."
 
@@ -60,11 +82,13 @@ if st.button("Submit Answer"):
     else:
         with st.spinner("Evaluating..."):
             # call evaluator which uses LangChain/OpenAI
+            context, _ = prefetcher.get_context(st.session_state.current_question, role, level)
             evaluation = evaluate_answer(
                 question=st.session_state.current_question,
                 answer=answer,
                 role=role,
-                level=level
+                level=level,
+                reference=context["reference"]
             )
 
     if evaluation is None:
@@ -122,6 +146,15 @@ if st.button("Submit Answer"):
             st.write(evaluation["model_answer"])
 
 
+# Prefetch metrics (process-wide)
+metrics = prefetch_metrics()
+if metrics["hit_rate"] is not None:
+    st.sidebar.caption(
+        f"Prefetch hit rate: {metrics['hit_rate']:.0%} | "
+        f"avg context (hit/miss): {metrics['avg_context_ms_hit'] or 0:.1f}ms / {metrics['avg_context_ms_miss'] or 0:.1f}ms | "
+        f"in flight (ready/not ready): {metrics['in_flight_hit']}/{metrics['in_flight_miss']}"
+    )
+
 # Session history viewer
 st.sidebar.markdown("---")
 st.sidebar.subheader("Recent Attempts")
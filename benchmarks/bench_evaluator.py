@@ -0,0 +1,70 @@
+# benchmarks/bench_evaluator.py
+"""
+Output tokens and latency of evaluate_answer with and without a precomputed
+reference answer. Needs GEMINI_API_KEY; questions without a stored
+reference are skipped unless --generate-missing is given.
+
+Usage: python benchmarks/bench_evaluator.py --role "Data Scientist" --runs 3 --generate-missing
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from src.evaluator import evaluate_answer
+from src.references import QUESTIONS_DIR, generate_reference, get_reference, role_slug
+
+ANSWER = ("I would start by clarifying the requirements, then describe the core idea, "
+          "walk through a concrete example and finish with the main trade-offs.")
+
+
+def run(question, role, level, reference):
+    t0 = time.perf_counter()
+    result = evaluate_answer(question, ANSWER, role, level, reference=reference)
+    elapsed = time.perf_counter() - t0
+    return elapsed, (result.get("usage") or {}).get("output_tokens")
+
+
+def summarize(label, samples):
+    latencies = [s[0] for s in samples]
+    tokens = [s[1] for s in samples if s[1] is not None]
+    print(f"{label:16s} latency median {statistics.median(latencies):6.2f} s  "
+          f"output tokens median {statistics.median(tokens) if tokens else 'n/a'}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--role", default="Data Scientist")
+    parser.add_argument("--runs", type=int, default=1, help="runs per question and path")
+    parser.add_argument("--generate-missing", action="store_true",
+                        help="generate (but do not store) references that were not precomputed")
+    args = parser.parse_args()
+
+    with open(os.path.join(QUESTIONS_DIR, f"{role_slug(args.role)}.json"), 'r', encoding='utf-8') as f:
+        bank = json.load(f)
+
+    baseline, precomputed = [], []
+    for level, questions in bank.items():
+        for question in questions:
+            reference = get_reference(args.role, level, question)
+            if reference is None and args.generate_missing:
+                reference = generate_reference(question, args.role, level)
+            if reference is None:
+                print(f"skipping (no reference): {question}")
+                continue
+            for _ in range(args.runs):
+                baseline.append(run(question, args.role, level, None))
+                precomputed.append(run(question, args.role, level, reference))
+
+    if not baseline:
+        raise SystemExit("No references found; run precompute_references.py first "
+                         "or pass --generate-missing.")
+    summarize("model_answer", baseline)
+    summarize("reference", precomputed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_storage.py
+"""
+Disk footprint and load_recent latency for session storage.
+
+Compares the legacy layout (one pretty-printed JSON array) with the
+segmented, gzip-compressed layout used by `src.storage.Storage`.
+
+Usage: python benchmarks/bench_storage.py --records 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from src.storage import Storage
+
+
+def make_record(i):
+    return {
+        "role": "Data Scientist",
+        "level": "Intermediate",
+        "question": f"Question {i % 50}: explain the bias-variance tradeoff.",
+        "answer": "A reasonably long candidate answer. " * 20,
+        "evaluation": {
+            "scores": {"relevance_and_correctness": 2, "structure_and_clarity": 1, "depth_and_examples": 1,
+                       "technical_accuracy": 2, "communication_and_conciseness": 1},
+            "total_score_out_of_10": 7.0,
+            "justifications": {"relevance_and_correctness": "Covers the main points."},
+            "improvement_tips": ["Add an example."],
+            "model_answer": "A concise model answer. " * 15,
+        },
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+def time_it(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_legacy(tmp, n):
+    path = os.path.join(tmp, "legacy.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([make_record(i) for i in range(n)], f, indent=2)
+
+    def load_recent():
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)[-10:]
+
+    return os.path.getsize(path), time_it(load_recent, repeat=1)
+
+
+def bench_segmented(tmp, n, segment_max_records):
+    storage = Storage(db_path=os.path.join(tmp, "sessions.json"), segment_max_records=segment_max_records)
+    t0 = time.perf_counter()
+    for i in range(n):
+        storage.save_interaction(make_record(i))
+    write_s = time.perf_counter() - t0
+    return storage.disk_usage(), time_it(lambda: storage.load_recent(limit=10)), write_s
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--segment-max-records", type=int, default=1000)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"records: {args.records}")
+        if not args.skip_legacy:
+            size, load_s = bench_legacy(tmp, args.records)
+            print(f"legacy     size: {size / 1e6:10.1f} MB  load_recent: {load_s * 1e3:10.2f} ms")
+        size, load_s, write_s = bench_segmented(tmp, args.records, args.segment_max_records)
+        print(f"segmented  size: {size / 1e6:10.1f} MB  load_recent: {load_s * 1e3:10.2f} ms"
+              f"  (append {args.records} records: {write_s:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+# precompute_references.py
+"""
+Offline job: generate reference answers and level-specific scoring anchors
+for every question in questions/*.json and store them in questions/references/.
+The evaluator then only has to score answers against them.
+
+Usage: python precompute_references.py [--role "ML Engineer"] [--overwrite]
+"""
+import argparse
+from src.references import precompute_references
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--role", action="append", help="only this role (repeatable)")
+    parser.add_argument("--overwrite", action="store_true", help="regenerate existing references")
+    args = parser.parse_args()
+    created = precompute_references(roles=args.role, overwrite=args.overwrite)
+    print(f"Generated {created} reference(s).")
@@ -50,6 +50,41 @@ Evaluate the candidate's answer and return a JSON object ONLY with this schema:
 Return JSON only — no extra commentary. If you cannot follow the schema exactly, still output a JSON object (best-effort).
 """)
 
+# Used when a precomputed reference answer exists (see src/references.py):
+# the model only scores against it, so it no longer writes a model_answer.
+EVAL_PROMPT_WITH_REFERENCE = Template("""
+You are an expert technical interview evaluator.
+Question: $question
+Reference Answer: $reference_answer
+Scoring Anchors (what a 0, 1 and 2 looks like per criterion): $rubric_anchors
+Candidate Answer: $answer
+Role: $role
+Level: $level
+
+Evaluate the candidate's answer against the reference and anchors and return a JSON object ONLY with this schema:
+
+{
+  "scores": {
+    "relevance_and_correctness": int,
+    "structure_and_clarity": int,
+    "depth_and_examples": int,
+    "technical_accuracy": int,
+    "communication_and_conciseness": int
+  },
+  "total_score_out_of_10": float,
+  "justifications": {
+    "relevance_and_correctness": "short justification",
+    "structure_and_clarity": "short justification",
+    "depth_and_examples": "short justification",
+    "technical_accuracy": "short justification",
+    "communication_and_conciseness": "short justification"
+  },
+  "improvement_tips": ["tip1", "tip2"]
+}
+
+Return JSON only — no extra commentary. If you cannot follow the schema exactly, still output a JSON object (best-effort).
+""")
+
 def extract_first_json(text: str):
     if not text:
         return None
@@ -98,8 +133,22 @@ def repair_and_normalize(data: dict):
             pass
     return data
 
-def evaluate_answer(question: str, answer: str, role: str, level: str):
-    prompt = EVAL_PROMPT.substitute(question=question, answer=answer, role=role, level=level)
+def build_prompt(question: str, answer: str, role: str, level: str, reference: dict = None):
+    if reference and reference.get("reference_answer"):
+        return EVAL_PROMPT_WITH_REFERENCE.substitute(
+            question=question, answer=answer, role=role, level=level,
+            reference_answer=reference["reference_answer"],
+            rubric_anchors=json.dumps(reference.get("rubric_anchors") or {}),
+        )
+    return EVAL_PROMPT.substitute(question=question, answer=answer, role=role, level=level)
+
+def evaluate_answer(question: str, answer: str, role: str, level: str, reference: dict = None):
+    """
+    Score an answer. If `reference` (from src.references.get_reference) is
+    given, the model skips writing a model answer and the stored reference
+    answer is returned as `model_answer` instead.
+    """
+    prompt = build_prompt(question, answer, role, level, reference)
     logger.debug("Prompt (trunc): %s", prompt[:1000])
 
     resp = run_prompt(prompt, max_output_tokens=700)
@@ -121,4 +170,8 @@ def evaluate_answer(question: str, answer: str, role: str, level: str):
         return {"raw_text": text, "parse_error": str(e)}
 
     data = repair_and_normalize(data)
+    if reference and reference.get("reference_answer"):
+        data["model_answer"] = reference["reference_answer"]
+    if resp.get("usage"):
+        data["usage"] = resp["usage"]
     return data
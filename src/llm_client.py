@@ -22,9 +22,27 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+_model = None
+
+
 def get_model():
-    """Return a ready-to-use GenerativeModel object."""
-    return genai.GenerativeModel(MODEL_NAME)
+    """Return a ready-to-use GenerativeModel object (shared, so its connection is reused)."""
+    global _model
+    if _model is None:
+        _model = genai.GenerativeModel(MODEL_NAME)
+    return _model
+
+
+def warm_up(text: str = "ping"):
+    """
+    Open the model client's connection ahead of a real request with a cheap
+    count_tokens call. Returns the token count, or None if the call failed.
+    """
+    try:
+        return getattr(get_model().count_tokens(text), "total_tokens", None)
+    except Exception:
+        logger.exception("Model warm-up failed")
+        return None
 
 
 def get_llm():
@@ -193,6 +211,24 @@ def debug_run_verbose(prompt: str = "Say hello", max_output_tokens: int = 512):
     return out
 
 
+def extract_usage(resp):
+    """Return prompt/output token counts from resp.usage_metadata, or None if unavailable."""
+    meta = getattr(resp, "usage_metadata", None)
+    if meta is None:
+        return None
+    usage = {}
+    for key, attr in (("prompt_tokens", "prompt_token_count"),
+                      ("output_tokens", "candidates_token_count"),
+                      ("total_tokens", "total_token_count")):
+        try:
+            value = getattr(meta, attr, None)
+        except Exception:
+            value = None
+        if value is not None:
+            usage[key] = int(value)
+    return usage or None
+
+
 # --- main run_prompt + lighter debug helper (drop-in replacements) ---
 
 def run_prompt(prompt: str, max_output_tokens: int = 2048):
@@ -235,7 +271,7 @@ def run_prompt(prompt: str, max_output_tokens: int = 2048):
         cand = cands[0]
         text, diag = safe_extract_text_from_candidate(cand)
         if text:
-            return {"text": text, "raw_repr": repr(resp), "diag": diag}
+            return {"text": text, "raw_repr": repr(resp), "diag": diag, "usage": extract_usage(resp)}
 
         # No text extracted — print & log full diagnostic info
         err = {
@@ -0,0 +1,162 @@
+# src/prefetch.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+logger = logging.getLogger(__name__)
+
+# One small pool and one set of metrics for the whole process; each
+# session's Prefetcher only holds its own futures.
+PREFETCH_WORKERS = 2
+_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+
+# How long a submit waits for a prefetch that is still running before
+# looking the reference up itself.
+IN_FLIGHT_WAIT_S = 0.5
+
+OUTCOMES = ("hit", "in_flight_hit", "in_flight_miss", "miss")
+
+
+class PrefetchMetrics:
+    """
+    Counters and get_context() latency per outcome. Only the context step
+    is timed: it is the part prefetching can speed up, and the model call
+    would drown it in noise.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {"prefetched": 0, "cancelled": 0, **{o: 0 for o in OUTCOMES}}
+        self._latency = {o: [0, 0.0] for o in OUTCOMES}  # samples, total seconds
+
+    def incr(self, name: str):
+        with self._lock:
+            self.counts[name] += 1
+
+    def record(self, outcome: str, seconds: float):
+        with self._lock:
+            self.counts[outcome] += 1
+            self._latency[outcome][0] += 1
+            self._latency[outcome][1] += seconds
+
+    def snapshot(self):
+        with self._lock:
+            out = dict(self.counts)
+            latency = {o: list(v) for o, v in self._latency.items()}
+        total = sum(out[o] for o in OUTCOMES)
+        out["hit_rate"] = (out["hit"] + out["in_flight_hit"]) / total if total else None
+        for outcome, (n, seconds) in latency.items():
+            out[f"avg_context_ms_{outcome}"] = seconds / n * 1000 if n else None
+        # ready prefetch vs. never prefetched; in-flight outcomes are reported separately
+        if out["avg_context_ms_hit"] is not None and out["avg_context_ms_miss"] is not None:
+            out["context_latency_reduction_ms"] = out["avg_context_ms_miss"] - out["avg_context_ms_hit"]
+        else:
+            out["context_latency_reduction_ms"] = None
+        return out
+
+
+_metrics = PrefetchMetrics()
+
+
+def metrics():
+    """Process-wide prefetch metrics (see PrefetchMetrics.snapshot)."""
+    return _metrics.snapshot()
+
+
+def load_reference(question: str, role: str, level: str):
+    """The stored reference for a question (a local, usually cached, JSON read)."""
+    from src.references import get_reference
+    return get_reference(role, level, question)
+
+
+def warm_client():
+    """Open the model client's connection (a network round trip)."""
+    # imported lazily: llm_client needs GEMINI_API_KEY at import time
+    from src.llm_client import warm_up
+    warm_up()
+
+
+class Prefetcher:
+    """
+    Builds evaluation context in the background while the user is typing.
+
+    Call `prefetch()` when a question is served and `get_context()` on
+    submit. The reference lookup and the client warm-up run as separate
+    jobs; submit only ever waits for the lookup, never for the warm-up. Only the latest question is kept: serving a new one cancels
+    older prefetches. Work runs on the shared process-wide pool and is
+    counted in the process-wide metrics unless `executor` / `metrics` are
+    given.
+    """
+
+    def __init__(self, lookup=load_reference, warm=warm_client, executor=None, metrics=None):
+        self._executor = executor or _executor
+        self._metrics = metrics or _metrics
+        self._lookup = lookup
+        self._warm = warm
+        self._futures = {}
+        self._warm_future = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(question, role, level):
+        return (question, role, level)
+
+    def prefetch(self, question: str, role: str, level: str):
+        key = self._key(question, role, level)
+        with self._lock:
+            for other in list(self._futures):
+                if other != key:
+                    self._cancel(other)
+            if key not in self._futures:
+                self._futures[key] = self._executor.submit(self._lookup, question, role, level)
+                self._metrics.incr("prefetched")
+            # one warm-up at a time is enough to keep the connection open
+            if self._warm is not None and (self._warm_future is None or self._warm_future.done()):
+                self._warm_future = self._executor.submit(self._warm)
+
+    def _cancel(self, key):
+        fut = self._futures.pop(key, None)
+        # a running lookup cannot be interrupted; its result is simply dropped
+        if fut is not None and not fut.done():
+            fut.cancel()
+            self._metrics.incr("cancelled")
+
+    def cancel(self, question: str = None, role: str = None, level: str = None):
+        """Cancel one prefetch, or all of them if no question is given."""
+        with self._lock:
+            keys = list(self._futures) if question is None else [self._key(question, role, level)]
+            for key in keys:
+                self._cancel(key)
+
+    def get_context(self, question: str, role: str, level: str, wait: float = IN_FLIGHT_WAIT_S):
+        """
+        Return (context, outcome) where outcome is one of OUTCOMES:
+        "hit" if the reference lookup had finished, "in_flight_hit" if it
+        finished within `wait` seconds, "in_flight_miss" if it was still
+        running after that, and "miss" if there was no (successful) prefetch.
+        Otherwise the reference is looked up inline. The warm-up is never
+        waited on.
+        """
+        t0 = time.perf_counter()
+        key = self._key(question, role, level)
+        with self._lock:
+            fut = self._futures.get(key)
+        outcome = "miss"
+        if fut is not None:
+            in_flight = not fut.done()
+            try:
+                ctx = {"reference": fut.result(timeout=wait if in_flight else 0)}
+                outcome = "in_flight_hit" if in_flight else "hit"
+                self._metrics.record(outcome, time.perf_counter() - t0)
+                return ctx, outcome
+            except TimeoutError:
+                outcome = "in_flight_miss"
+            except Exception:
+                logger.exception("Prefetch failed; building context inline")
+                with self._lock:
+                    if self._futures.get(key) is fut:
+                        del self._futures[key]
+        ctx = {"reference": self._lookup(question, role, level)}
+        self._metrics.record(outcome, time.perf_counter() - t0)
+        return ctx, outcome
@@ -0,0 +1,148 @@
+# src/references.py
+import json
+import os
+import logging
+from string import Template
+
+logger = logging.getLogger(__name__)
+
+QUESTIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "questions")
+REFERENCES_DIR = os.path.join(QUESTIONS_DIR, "references")
+
+CRITERIA = (
+    "relevance_and_correctness",
+    "structure_and_clarity",
+    "depth_and_examples",
+    "technical_accuracy",
+    "communication_and_conciseness",
+)
+
+REFERENCE_PROMPT = Template("""
+You are an expert technical interviewer preparing an answer key.
+Question: $question
+Role: $role
+Level: $level
+
+Write a concise reference answer a strong $level $role candidate would give,
+and for each rubric criterion describe what a 0, 1 and 2 answer looks like
+for THIS question at THIS level. Return a JSON object ONLY with this schema:
+
+{
+  "reference_answer": "concise model answer",
+  "rubric_anchors": {
+    "relevance_and_correctness": {"0": "...", "1": "...", "2": "..."},
+    "structure_and_clarity": {"0": "...", "1": "...", "2": "..."},
+    "depth_and_examples": {"0": "...", "1": "...", "2": "..."},
+    "technical_accuracy": {"0": "...", "1": "...", "2": "..."},
+    "communication_and_conciseness": {"0": "...", "1": "...", "2": "..."}
+  }
+}
+
+Return JSON only — no extra commentary.
+""")
+
+_cache = {}
+
+
+def role_slug(role: str):
+    """Map a role name ("ML Engineer") to its question bank file stem ("ml_engineer")."""
+    return role.lower().replace(' ', '_')
+
+
+def role_name(slug: str):
+    """Inverse of role_slug for the bank's file names ("ml_engineer" -> "ML Engineer")."""
+    return " ".join(w.upper() if len(w) <= 2 else w.title() for w in slug.split('_'))
+
+
+def references_path(role: str, references_dir=REFERENCES_DIR):
+    return os.path.join(references_dir, f"{role_slug(role)}.json")
+
+
+def load_references(role: str, references_dir=REFERENCES_DIR):
+    """
+    Return {level: {question: reference}} for a role, or {} if none were
+    precomputed. Cached per file mtime, so a running app picks up new or
+    updated references; missing files are not cached.
+    """
+    path = references_path(role, references_dir)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        _cache.pop(path, None)
+        return {}
+    cached = _cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = _cache[path] = (mtime, json.load(f))
+    return cached[1]
+
+
+def get_reference(role: str, level: str, question: str, references_dir=REFERENCES_DIR):
+    """Return the stored {"reference_answer", "rubric_anchors"} for a question, or None."""
+    return load_references(role, references_dir).get(level, {}).get(question)
+
+
+def generate_reference(question: str, role: str, level: str):
+    """Ask the model for a reference answer and scoring anchors. Returns None on failure."""
+    # imported lazily: these modules need GEMINI_API_KEY at import time
+    from src.llm_client import run_prompt
+    from src.evaluator import extract_first_json
+
+    prompt = REFERENCE_PROMPT.substitute(question=question, role=role, level=level)
+    resp = run_prompt(prompt, max_output_tokens=2048)
+    if "error" in resp:
+        logger.error("Reference generation failed for %r: %s", question, resp["error"])
+        return None
+    jtxt = extract_first_json(resp.get("text", ""))
+    try:
+        data = json.loads(jtxt) if jtxt else None
+    except Exception:
+        logger.exception("Reference JSON parse failed for %r", question)
+        return None
+    if not isinstance(data, dict) or not data.get("reference_answer"):
+        return None
+    anchors = data.get("rubric_anchors") or {}
+    return {
+        "reference_answer": str(data["reference_answer"]),
+        "rubric_anchors": {k: anchors[k] for k in CRITERIA if k in anchors},
+    }
+
+
+def precompute_references(roles=None, overwrite=False, questions_dir=QUESTIONS_DIR,
+                          references_dir=REFERENCES_DIR, generate=generate_reference):
+    """
+    Generate references for every question in `questions_dir/*.json` and
+    write them to `references_dir/<role>.json`. Existing entries are kept
+    unless `overwrite` is set. Returns the number of new references.
+    """
+    os.makedirs(references_dir, exist_ok=True)
+    created = 0
+    for fname in sorted(os.listdir(questions_dir)):
+        if not fname.endswith(".json"):
+            continue
+        slug = fname[:-len(".json")]
+        if roles and slug not in {role_slug(r) for r in roles}:
+            continue
+        with open(os.path.join(questions_dir, fname), 'r', encoding='utf-8') as f:
+            bank = json.load(f)
+        out_path = references_path(slug, references_dir)
+        try:
+            with open(out_path, 'r', encoding='utf-8') as f:
+                refs = json.load(f)
+        except FileNotFoundError:
+            refs = {}
+        role = role_name(slug)
+        for level, questions in bank.items():
+            level_refs = refs.setdefault(level, {})
+            for question in questions:
+                if question in level_refs and not overwrite:
+                    continue
+                ref = generate(question, role, level)
+                if ref is None:
+                    continue
+                level_refs[question] = ref
+                created += 1
+                # write after every question so an interrupted run keeps its progress
+                with open(out_path, 'w', encoding='utf-8') as f:
+                    json.dump(refs, f, indent=2, ensure_ascii=False)
+    return created
@@ -1,26 +1,345 @@
 # src/storage.py
+import gzip
 import json
+import logging
 import os
-from datetime import datetime
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+# Fields kept for records older than `downsample_after_days`.
+DOWNSAMPLED_FIELDS = ("role", "level", "question", "timestamp")
+
 
 class Storage:
-    def __init__(self, db_path="sessions.json"):
+    """
+    Append-only session history split into segments.
+
+    `db_path` holds a small JSON manifest; the records themselves live in
+    `<db_path without extension>_segments/` as JSON Lines files. New records
+    are appended to the hot segment, which is sealed (and gzip-compressed)
+    once it reaches `segment_max_records` records or `segment_max_age`.
+    Recent reads only touch the hot segment unless they need more history.
+
+    A legacy `sessions.json` holding a plain JSON array is migrated on open;
+    the original is kept as `<db_path>.bak`.
+
+    Several instances (or processes) may share one `db_path`: every operation
+    takes a lock on `<db_path>.lock` and reloads the manifest and hot-segment
+    state if another writer changed them.
+    """
+
+    def __init__(self, db_path="sessions.json", segment_max_records=1000,
+                 segment_max_age=timedelta(days=1), compress=True,
+                 retention_days=None, downsample_after_days=None):
         self.db_path = db_path
-        if not os.path.exists(self.db_path):
-            with open(self.db_path, 'w', encoding='utf-8') as f:
-                json.dump([], f)
+        self.segment_dir = os.path.splitext(db_path)[0] + "_segments"
+        self.segment_max_records = segment_max_records
+        self.segment_max_age = segment_max_age
+        self.compress = compress
+        self.retention_days = retention_days
+        self.downsample_after_days = downsample_after_days
+        self.lock_path = db_path + ".lock"
+        self._lock = threading.RLock()
+        self._compaction_thread = None
+        self._compaction_stop = threading.Event()
+        self._manifest_stat = None
+        self._hot_size = None
+
+        with self._locked(refresh=False):
+            self._load_manifest()
+            self._refresh(repair=True)
+
+    # ------------------- locking -------------------
+
+    @contextmanager
+    def _locked(self, shared=False, refresh=True):
+        """Hold the cross-process file lock and bring in-memory state up to date."""
+        with self._lock:
+            with open(self.lock_path, 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+                try:
+                    if refresh:
+                        self._refresh(repair=not shared)
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self, repair=False):
+        """
+        Reload the manifest and rescan the hot segment if another writer
+        changed them. With `repair` (exclusive lock only), a partly written
+        last line left by a crashed writer is truncated first.
+        """
+        st = os.stat(self.db_path)
+        stat_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if stat_key != self._manifest_stat:
+            with open(self.db_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+            self._manifest_stat = stat_key
+            self._hot_size = None
+        hot_path = self._segment_path(self.manifest["hot"])
+        size = os.path.getsize(hot_path) if os.path.exists(hot_path) else 0
+        if size != self._hot_size and repair and size:
+            size = truncate_partial_line(hot_path)
+        if size != self._hot_size:
+            self._hot_count, self._hot_start = self._scan_hot()
+            self._hot_size = size
+
+    # ------------------- manifest -------------------
+
+    def _load_manifest(self):
+        """Load the manifest, creating it or migrating a legacy JSON array as needed."""
+        if os.path.exists(self.db_path):
+            with open(self.db_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, list):
+                self._migrate(data)
+            else:
+                self.manifest = data
+            return
+        self.manifest = {"version": MANIFEST_VERSION, "next_id": 0, "sealed": [], "hot": None}
+        self.manifest["hot"] = self._new_segment_name()
+        os.makedirs(self.segment_dir, exist_ok=True)
+        self._write_manifest()
+
+    def _write_manifest(self):
+        tmp = self.db_path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, self.db_path)
+        st = os.stat(self.db_path)
+        self._manifest_stat = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _new_segment_name(self):
+        name = f"segment-{self.manifest['next_id']:08d}.jsonl"
+        self.manifest["next_id"] += 1
+        return name
+
+    def _migrate(self, records):
+        """
+        Convert a legacy JSON array into segments. Segments are written to a
+        fresh directory and `db_path` is only replaced by the manifest as the
+        very last step, so an interrupted migration simply runs again.
+        """
+        tmp_dir = self.segment_dir + ".migrating"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        self.manifest = {"version": MANIFEST_VERSION, "next_id": 0, "sealed": [], "hot": None}
+        n = self.segment_max_records
+        chunks = [records[i:i + n] for i in range(0, len(records), n)] or [[]]
+        # all but the last chunk are sealed; the last one becomes the hot segment
+        for chunk in chunks[:-1]:
+            name = self._new_segment_name() + (".gz" if self.compress else "")
+            self._write_segment(name, chunk, directory=tmp_dir)
+            self.manifest["sealed"].append(sealed_entry(name, chunk))
+        self.manifest["hot"] = self._new_segment_name()
+        if chunks[-1]:
+            self._write_segment(self.manifest["hot"], chunks[-1], directory=tmp_dir)
+        # nothing references an existing segment dir while db_path is still a legacy array
+        shutil.rmtree(self.segment_dir, ignore_errors=True)
+        os.replace(tmp_dir, self.segment_dir)
+        shutil.copy2(self.db_path, self.db_path + ".bak")
+        self._write_manifest()
+
+    # ------------------- segment io -------------------
+
+    def _segment_path(self, name):
+        return os.path.join(self.segment_dir, name)
+
+    def _read_segment(self, name):
+        path = self._segment_path(name)
+        if not os.path.exists(path):
+            return []
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            lines = [line for line in f if line.strip()]
+        records = [json.loads(line) for line in lines[:-1]]
+        if lines:
+            try:
+                records.append(json.loads(lines[-1]))
+            except json.JSONDecodeError:
+                # a writer crashed mid-append; the next exclusive open truncates it
+                logger.warning("Skipping partly written last line in %s", path)
+        return records
+
+    def _write_segment(self, name, records, directory=None):
+        path = os.path.join(directory or self.segment_dir, name)
+        tmp = path + ".tmp"
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(tmp, 'wt', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        os.replace(tmp, path)
+
+    def _scan_hot(self):
+        records = self._read_segment(self.manifest["hot"])
+        start = records[0].get("timestamp") if records else None
+        return len(records), start
+
+    def _append(self, record):
+        if self._hot_should_roll():
+            self._roll()
+        with open(self._segment_path(self.manifest["hot"]), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+            self._hot_size = f.tell()
+        self._hot_count += 1
+        if self._hot_start is None:
+            self._hot_start = record.get("timestamp")
+
+    def _hot_should_roll(self, now=None):
+        if self._hot_count == 0:
+            return False
+        if self._hot_count >= self.segment_max_records:
+            return True
+        if self.segment_max_age is not None and self._hot_start:
+            now = now or datetime.utcnow()
+            return now - datetime.fromisoformat(self._hot_start) >= self.segment_max_age
+        return False
+
+    def _roll(self):
+        """Seal the hot segment (compressing it if enabled) and start a new one."""
+        name = self.manifest["hot"]
+        records = self._read_segment(name)
+        sealed_name = name + ".gz" if self.compress else name
+        if self.compress:
+            self._write_segment(sealed_name, records)
+        self.manifest["sealed"].append(sealed_entry(sealed_name, records))
+        self.manifest["hot"] = self._new_segment_name()
+        self._hot_count, self._hot_start, self._hot_size = 0, None, 0
+        # the manifest must point at the sealed copy before the hot file goes away
+        self._write_manifest()
+        if self.compress:
+            os.remove(self._segment_path(name))
+
+    # ------------------- public api -------------------
 
     def save_interaction(self, record: dict):
-        data = self._read_all()
         record["timestamp"] = datetime.utcnow().isoformat()
-        data.append(record)
-        with open(self.db_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+        with self._locked():
+            self._append(record)
 
     def _read_all(self):
-        with open(self.db_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with self._locked(shared=True):
+            data = []
+            for seg in self.manifest["sealed"]:
+                data.extend(self._read_segment(seg["name"]))
+            data.extend(self._read_segment(self.manifest["hot"]))
+            return data
 
     def load_recent(self, limit=10):
-        data = self._read_all()
-        return data[-limit:]
+        with self._locked(shared=True):
+            data = self._read_segment(self.manifest["hot"])
+            for seg in reversed(self.manifest["sealed"]):
+                if len(data) >= limit:
+                    break
+                data = self._read_segment(seg["name"]) + data
+            return data[-limit:] if limit > 0 else []
+
+    # ------------------- retention & compaction -------------------
+
+    def compact(self, now=None):
+        """
+        Apply retention and downsampling to sealed segments.
+        Segments that ended more than `retention_days` ago are deleted; those
+        older than `downsample_after_days` keep only scores and metadata.
+        Returns a dict with the number of segments dropped and downsampled.
+        """
+        now = now or datetime.utcnow()
+        downsampled = 0
+        with self._locked():
+            if self._hot_should_roll(now):
+                self._roll()
+            kept, expired = [], []
+            for seg in self.manifest["sealed"]:
+                end = datetime.fromisoformat(seg["end"]) if seg.get("end") else now
+                age = now - end
+                if self.retention_days is not None and age >= timedelta(days=self.retention_days):
+                    expired.append(seg["name"])
+                    continue
+                if (self.downsample_after_days is not None and not seg.get("downsampled")
+                        and age >= timedelta(days=self.downsample_after_days)):
+                    records = [downsample_record(r) for r in self._read_segment(seg["name"])]
+                    self._write_segment(seg["name"], records)
+                    seg["downsampled"] = True
+                    downsampled += 1
+                kept.append(seg)
+            self.manifest["sealed"] = kept
+            self._write_manifest()
+            for name in expired:
+                path = self._segment_path(name)
+                if os.path.exists(path):
+                    os.remove(path)
+        return {"dropped": len(expired), "downsampled": downsampled}
+
+    def start_background_compaction(self, interval_seconds=3600):
+        """Run `compact()` every `interval_seconds` on a daemon thread."""
+        if self._compaction_thread and self._compaction_thread.is_alive():
+            return
+        self._compaction_stop.clear()
+
+        def loop():
+            while not self._compaction_stop.wait(interval_seconds):
+                try:
+                    self.compact()
+                except Exception:
+                    logger.exception("Background compaction failed; retrying in %ss", interval_seconds)
+
+        self._compaction_thread = threading.Thread(target=loop, name="storage-compaction", daemon=True)
+        self._compaction_thread.start()
+
+    def stop_background_compaction(self):
+        self._compaction_stop.set()
+        if self._compaction_thread:
+            self._compaction_thread.join()
+            self._compaction_thread = None
+
+    def disk_usage(self):
+        """Total bytes used by the manifest and all segments."""
+        total = os.path.getsize(self.db_path)
+        for name in os.listdir(self.segment_dir):
+            total += os.path.getsize(self._segment_path(name))
+        return total
+
+
+def truncate_partial_line(path: str):
+    """Cut a JSON Lines file back to its last newline. Returns the new size."""
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if not data or data.endswith(b"\n"):
+            return len(data)
+        end = data.rfind(b"\n") + 1
+        logger.warning("Truncating partly written line at byte %d of %s", end, path)
+        f.truncate(end)
+        return end
+
+
+def sealed_entry(name: str, records: list):
+    """Manifest entry for a sealed segment."""
+    return {
+        "name": name,
+        "count": len(records),
+        "start": records[0].get("timestamp") if records else None,
+        "end": records[-1].get("timestamp") if records else None,
+        "downsampled": False,
+    }
+
+
+def downsample_record(record: dict):
+    """Keep only metadata and scores from a stored interaction."""
+    out = {k: record[k] for k in DOWNSAMPLED_FIELDS if k in record}
+    evaluation = record.get("evaluation") or {}
+    out["evaluation"] = {k: evaluation[k] for k in ("scores", "total_score_out_of_10") if k in evaluation}
+    return out
@@ -0,0 +1,38 @@
+# tests/test_evaluator.py
+import importlib
+import json
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+REFERENCE = {
+    "reference_answer": "Stored reference answer.",
+    "rubric_anchors": {"technical_accuracy": {"0": "wrong", "1": "partly", "2": "correct"}},
+}
+
+@pytest.fixture
+def evaluator(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    return importlib.import_module("src.evaluator")
+
+def test_prompt_with_reference_omits_model_answer(evaluator):
+    with_ref = evaluator.build_prompt("Q?", "A", "ML Engineer", "Junior", REFERENCE)
+    without_ref = evaluator.build_prompt("Q?", "A", "ML Engineer", "Junior")
+    assert "model_answer" not in with_ref
+    assert "Stored reference answer." in with_ref and "correct" in with_ref
+    assert "model_answer" in without_ref
+
+def test_evaluate_answer_uses_stored_reference_and_passes_usage(evaluator, monkeypatch):
+    prompts = []
+
+    def fake_run_prompt(prompt, max_output_tokens=2048):
+        prompts.append(prompt)
+        body = {"scores": {"technical_accuracy": 2}, "justifications": {}, "improvement_tips": []}
+        return {"text": json.dumps(body), "usage": {"output_tokens": 42}}
+
+    monkeypatch.setattr(evaluator, "run_prompt", fake_run_prompt)
+    result = evaluator.evaluate_answer("Q?", "A", "ML Engineer", "Junior", reference=REFERENCE)
+    assert result["model_answer"] == "Stored reference answer."
+    assert result["usage"] == {"output_tokens": 42}
+    assert result["total_score_out_of_10"] == 2.0
+    assert "model_answer" not in prompts[0]
@@ -0,0 +1,79 @@
+# tests/test_prefetch.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.prefetch import Prefetcher, PrefetchMetrics
+
+def make_lookup(calls, gate=None):
+    def lookup(question, role, level):
+        if gate is not None:
+            gate.wait()
+        calls.append(question)
+        return {"reference_answer": f"reference for {question}"}
+    return lookup
+
+def test_prefetch_hit_and_miss():
+    calls, metrics = [], PrefetchMetrics()
+    prefetcher = Prefetcher(lookup=make_lookup(calls), warm=None, metrics=metrics)
+    prefetcher.prefetch("Q1", "ML Engineer", "Junior")
+    prefetcher._futures[("Q1", "ML Engineer", "Junior")].result(timeout=5)
+    ctx, outcome = prefetcher.get_context("Q1", "ML Engineer", "Junior")
+    assert outcome == "hit"
+    assert ctx["reference"]["reference_answer"] == "reference for Q1"
+    ctx, outcome = prefetcher.get_context("Q2", "ML Engineer", "Junior")
+    assert outcome == "miss" and ctx["reference"]["reference_answer"] == "reference for Q2"
+    assert calls == ["Q1", "Q2"]
+    snapshot = metrics.snapshot()
+    assert snapshot["prefetched"] == 1 and snapshot["hit"] == 1 and snapshot["miss"] == 1
+    assert snapshot["hit_rate"] == 0.5
+    assert snapshot["avg_context_ms_hit"] is not None and snapshot["context_latency_reduction_ms"] is not None
+
+def test_metrics_are_shared_across_sessions():
+    a, b = Prefetcher(lookup=make_lookup([]), warm=None), Prefetcher(lookup=make_lookup([]), warm=None)
+    assert a._metrics is b._metrics
+
+def test_in_flight_prefetch_is_counted_separately():
+    calls, gate = [], threading.Event()
+    executor = ThreadPoolExecutor(max_workers=1)
+    prefetcher = Prefetcher(lookup=make_lookup(calls, gate), warm=None, executor=executor,
+                            metrics=PrefetchMetrics())
+    prefetcher.prefetch("Q1", "Data Scientist", "Senior")
+    # still running after the wait: built inline, counted as in_flight_miss
+    threading.Timer(0.2, gate.set).start()
+    ctx, outcome = prefetcher.get_context("Q1", "Data Scientist", "Senior", wait=0.01)
+    assert outcome == "in_flight_miss"
+    # a later submit for the same question finds the finished prefetch
+    ctx, outcome = prefetcher.get_context("Q1", "Data Scientist", "Senior", wait=5)
+    assert outcome in ("hit", "in_flight_hit")
+    counts = prefetcher._metrics.counts
+    assert counts["in_flight_miss"] == 1 and counts["miss"] == 0
+    executor.shutdown()
+
+def test_new_question_cancels_pending_prefetch():
+    calls, gate = [], threading.Event()
+    executor = ThreadPoolExecutor(max_workers=1)
+    prefetcher = Prefetcher(lookup=make_lookup(calls, gate), warm=None, executor=executor,
+                            metrics=PrefetchMetrics())
+    prefetcher.prefetch("Q1", "AI Engineer", "Senior")  # occupies the only worker
+    prefetcher.prefetch("Q2", "AI Engineer", "Senior")  # cancels Q1 (running, result dropped)
+    prefetcher.prefetch("Q3", "AI Engineer", "Senior")  # cancels queued Q2
+    assert prefetcher._metrics.counts["cancelled"] == 2
+    gate.set()
+    ctx, outcome = prefetcher.get_context("Q3", "AI Engineer", "Senior", wait=5)
+    assert outcome in ("hit", "in_flight_hit") and ctx["reference"]["reference_answer"] == "reference for Q3"
+    assert "Q2" not in calls
+    executor.shutdown()
+
+def test_prefetchers_share_one_pool():
+    assert Prefetcher()._executor is Prefetcher()._executor
+
+def test_submit_does_not_wait_for_warm_up():
+    warm_gate = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=2)
+    prefetcher = Prefetcher(lookup=make_lookup([]), warm=warm_gate.wait, executor=executor,
+                            metrics=PrefetchMetrics())
+    prefetcher.prefetch("Q1", "ML Engineer", "Senior")
+    ctx, outcome = prefetcher.get_context("Q1", "ML Engineer", "Senior", wait=5)
+    assert outcome in ("hit", "in_flight_hit")
+    assert not prefetcher._warm_future.done()
+    warm_gate.set()
+    executor.shutdown()
@@ -0,0 +1,29 @@
+# tests/test_references.py
+import json
+from src.references import precompute_references, get_reference
+
+def test_precompute_and_lookup(tmp_path):
+    qdir = tmp_path / "questions"
+    qdir.mkdir()
+    (qdir / "ml_engineer.json").write_text(json.dumps({"Junior": ["What is a confusion matrix?"]}))
+    rdir = qdir / "references"
+    calls = []
+
+    def fake_generate(question, role, level):
+        calls.append((question, role, level))
+        return {"reference_answer": "A table of predictions vs labels.", "rubric_anchors": {}}
+
+    assert precompute_references(questions_dir=str(qdir), references_dir=str(rdir), generate=fake_generate) == 1
+    assert calls == [("What is a confusion matrix?", "ML Engineer", "Junior")]
+    # existing entries are skipped unless overwrite is set
+    assert precompute_references(questions_dir=str(qdir), references_dir=str(rdir), generate=fake_generate) == 0
+    ref = get_reference("ML Engineer", "Junior", "What is a confusion matrix?", references_dir=str(rdir))
+    assert ref["reference_answer"] == "A table of predictions vs labels."
+    assert get_reference("ML Engineer", "Senior", "Missing?", references_dir=str(rdir)) is None
+
+def test_references_written_after_first_lookup_are_picked_up(tmp_path):
+    rdir = tmp_path / "references"
+    assert get_reference("AI Engineer", "Junior", "Q?", references_dir=str(rdir)) is None
+    rdir.mkdir()
+    (rdir / "ai_engineer.json").write_text(json.dumps({"Junior": {"Q?": {"reference_answer": "A"}}}))
+    assert get_reference("AI Engineer", "Junior", "Q?", references_dir=str(rdir))["reference_answer"] == "A"